@@ -0,0 +1,287 @@
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Контейнер roaring: до ARRAY_LIMIT значений - отсортированный uint16-массив, больше - битсет
+ARRAY_LIMIT = 4096
+BITSET_WORDS = 1024  # 65536 бит
+
+JOB_ATTRIBUTES = ['remote_allowed', 'formatted_work_type', 'formatted_experience_level']
+
+
+def _popcount(bits):
+    return int(np.unpackbits(bits.view(np.uint8)).sum())
+
+
+def _to_bitset(container):
+    if container.dtype == np.uint64:
+        return container
+    bits = np.zeros(BITSET_WORDS, dtype=np.uint64)
+    values = container.astype(np.uint64)
+    np.bitwise_or.at(bits, (values >> np.uint64(6)).astype(np.int64), np.uint64(1) << (values & np.uint64(63)))
+    return bits
+
+
+def _to_array(bits):
+    bools = np.unpackbits(bits.view(np.uint8), bitorder='little').astype(bool)
+    return np.flatnonzero(bools).astype(np.uint16)
+
+
+def _normalize(container):
+    """Выбирает компактное представление по мощности; пустой контейнер → None"""
+    if container.dtype == np.uint64:
+        count = _popcount(container)
+        if count == 0:
+            return None
+        return _to_array(container) if count <= ARRAY_LIMIT else container
+    if len(container) == 0:
+        return None
+    return _to_bitset(container) if len(container) > ARRAY_LIMIT else container
+
+
+def _contains(bits, values):
+    words = bits[(values >> 6).astype(np.int64)]
+    return ((words >> (values & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+
+def _and(a, b):
+    if a.dtype == np.uint16 and b.dtype == np.uint16:
+        return np.intersect1d(a, b, assume_unique=True)
+    if a.dtype == np.uint64 and b.dtype == np.uint64:
+        return a & b
+    array, bits = (a, b) if a.dtype == np.uint16 else (b, a)
+    return array[_contains(bits, array)]
+
+
+def _or(a, b):
+    if a.dtype == np.uint16 and b.dtype == np.uint16:
+        return np.union1d(a, b).astype(np.uint16)
+    return _to_bitset(a) | _to_bitset(b)
+
+
+def _andnot(a, b):
+    if a.dtype == np.uint16 and b.dtype == np.uint16:
+        return np.setdiff1d(a, b, assume_unique=True).astype(np.uint16)
+    if a.dtype == np.uint16:
+        return a[~_contains(b, a)]
+    return a & ~_to_bitset(b)
+
+
+def _align_ids(values, reference):
+    """Приводит job_id к типу job_id из jobs (BIGINT или TEXT) - иначе get_indexer вернет -1"""
+    if pd.api.types.is_numeric_dtype(reference):
+        return pd.to_numeric(values, errors='coerce')
+    return values.astype(str).str.strip()
+
+
+class RoaringBitmap:
+    """Сжатое множество uint32: старшие 16 бит → контейнер (массив или битсет)"""
+
+    def __init__(self, containers=None):
+        self.containers = containers or {}
+
+    @classmethod
+    def from_positions(cls, positions):
+        positions = np.unique(np.asarray(positions, dtype=np.uint32))
+        high = positions >> 16
+        keys, starts = np.unique(high, return_index=True)
+        ends = np.append(starts[1:], len(positions))
+        containers = {}
+        for key, start, end in zip(keys, starts, ends):
+            container = _normalize((positions[start:end] & 0xFFFF).astype(np.uint16))
+            if container is not None:
+                containers[int(key)] = container
+        return cls(containers)
+
+    def _combine(self, other, op, keys):
+        containers = {}
+        for key in keys:
+            a, b = self.containers.get(key), other.containers.get(key)
+            # Ключ есть только с одной стороны - возможно лишь для OR (и для a в AND NOT)
+            if a is None:
+                result = b
+            elif b is None:
+                result = a
+            else:
+                result = _normalize(op(a, b))
+            if result is not None:
+                containers[key] = result
+        return RoaringBitmap(containers)
+
+    def __and__(self, other):
+        return self._combine(other, _and, self.containers.keys() & other.containers.keys())
+
+    def __or__(self, other):
+        return self._combine(other, _or, self.containers.keys() | other.containers.keys())
+
+    def __sub__(self, other):
+        return self._combine(other, _andnot, self.containers.keys())
+
+    def __len__(self):
+        return sum(_popcount(c) if c.dtype == np.uint64 else len(c) for c in self.containers.values())
+
+    def to_positions(self):
+        parts = []
+        for key in sorted(self.containers):
+            container = self.containers[key]
+            low = _to_array(container) if container.dtype == np.uint64 else container
+            parts.append((np.uint32(key) << 16) | low.astype(np.uint32))
+        return np.concatenate(parts) if parts else np.array([], dtype=np.uint32)
+
+    def memory_bytes(self):
+        return sum(c.nbytes for c in self.containers.values())
+
+
+class JobBitmapIndex:
+    """Битмап-индекс вакансий по низкокардинальным атрибутам
+
+    job_id переводятся в плотные номера (позиции), для каждого значения
+    атрибута хранится RoaringBitmap позиций. Фильтры и разбивки считаются
+    операциями над битмапами вместо JOIN в SQL.
+    source - маркер данных, по которым построен индекс (число строк jobs,
+    run_id импорта); по нему загруженный индекс проверяется на актуальность.
+    Импорт и проверка актуальности перестраивают индекс целиком; add_jobs и
+    remove_positions - для точечного обновления из вызывающего кода.
+    """
+
+    def __init__(self):
+        self.job_ids = pd.Index([])
+        self.bitmaps = {}  # атрибут → {значение → RoaringBitmap}
+        self.source = {}
+
+    def positions_for(self, job_ids, add_missing=False):
+        """Позиции job_id в индексе; новые job_id получают позиции в конце"""
+        job_ids = pd.Index(job_ids)
+        if add_missing:
+            new_ids = job_ids[~job_ids.isin(self.job_ids)].unique()
+            if len(self.job_ids) == 0:
+                self.job_ids = pd.Index(new_ids)
+            elif len(new_ids) > 0:
+                self.job_ids = self.job_ids.append(new_ids)
+        return self.job_ids.get_indexer(job_ids)
+
+    def remove_positions(self, positions, attributes=None):
+        """Убирает позиции из битмапов (при обновлении атрибутов вакансий)"""
+        removed = RoaringBitmap.from_positions(positions)
+        for attr in attributes or list(self.bitmaps):
+            values = self.bitmaps.get(attr, {})
+            for value in list(values):
+                values[value] = values[value] - removed
+                if len(values[value].containers) == 0:
+                    del values[value]
+
+    def add_values(self, attr, job_ids, values, add_missing=False, replace=True):
+        """Добавляет значения атрибута; replace=True сначала сбрасывает прежние значения этих вакансий"""
+        positions = self.positions_for(job_ids, add_missing=add_missing)
+        frame = pd.DataFrame({'position': positions, 'value': np.asarray(values, dtype=object)})
+        frame = frame[frame['position'] >= 0]
+        if replace and attr in self.bitmaps and len(frame) > 0:
+            self.remove_positions(frame['position'].to_numpy(), [attr])
+        frame = frame[frame['value'].notna()]
+        attr_bitmaps = self.bitmaps.setdefault(attr, {})
+        for value, group in frame.groupby('value')['position']:
+            bitmap = RoaringBitmap.from_positions(group.to_numpy())
+            attr_bitmaps[value] = attr_bitmaps[value] | bitmap if value in attr_bitmaps else bitmap
+        return len(frame)
+
+    def add_jobs(self, jobs):
+        """Добавляет или обновляет вакансии (job_id + атрибуты JOB_ATTRIBUTES)"""
+        for attr in JOB_ATTRIBUTES:
+            if attr in jobs.columns:
+                self.add_values(attr, jobs['job_id'], jobs[attr], add_missing=True)
+        return len(jobs)
+
+    def add_benefits(self, benefits):
+        """Бенефиты (job_id, type) - атрибут benefit"""
+        return self.add_values('benefit', benefits['job_id'], benefits['type'], replace=False)
+
+    def add_industries(self, job_industries):
+        """Отрасли (job_id, industry_name) - атрибут industry"""
+        return self.add_values('industry', job_industries['job_id'], job_industries['industry_name'], replace=False)
+
+    def bitmap(self, attr, value):
+        return self.bitmaps.get(attr, {}).get(value, RoaringBitmap())
+
+    def all_jobs(self):
+        return RoaringBitmap.from_positions(np.arange(len(self.job_ids)))
+
+    def query(self, filters):
+        """Битмап вакансий по фильтру
+
+        filters - dict {атрибут: значение или список значений}: значения одного
+        атрибута объединяются через OR, атрибуты - через AND.
+        Список таких dict объединяется через OR.
+        """
+        if isinstance(filters, (list, tuple)):
+            result = RoaringBitmap()
+            for group in filters:
+                result = result | self.query(group)
+            return result
+
+        result = None
+        for attr, values in (filters or {}).items():
+            values = values if isinstance(values, (list, tuple, set)) else [values]
+            matched = RoaringBitmap()
+            for value in values:
+                matched = matched | self.bitmap(attr, value)
+            result = matched if result is None else result & matched
+        return self.all_jobs() if result is None else result
+
+    def count(self, filters):
+        return len(self.query(filters))
+
+    def breakdown(self, filters, by):
+        """Число вакансий по значениям атрибута by среди отфильтрованных"""
+        selected = self.query(filters)
+        total = len(selected)
+        rows = [(value, len(selected & bitmap)) for value, bitmap in self.bitmaps.get(by, {}).items()]
+        df = pd.DataFrame(rows, columns=[by, 'job_count'])
+        df = df[df['job_count'] > 0].sort_values('job_count', ascending=False, kind='stable')
+        df['share_pct'] = (100.0 * df['job_count'] / total).round(1) if total else 0.0
+        return df.reset_index(drop=True)
+
+    def job_ids_for(self, filters):
+        return self.job_ids[self.query(filters).to_positions().astype(np.int64)]
+
+    def memory_bytes(self):
+        return sum(b.memory_bytes() for values in self.bitmaps.values() for b in values.values())
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return path
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def is_current(self, source):
+        """Совпадает ли маркер индекса с текущим состоянием данных"""
+        # В индексах, сохраненных до появления маркера, атрибута source нет
+        stored = getattr(self, 'source', {})
+        return all(stored.get(key) == value for key, value in source.items())
+
+    @classmethod
+    def from_database(cls, engine, source=None):
+        """Строит индекс по таблицам jobs, job_benefits и job_industries
+
+        job_benefits - все бенефиты вакансий; в benefits остается по одному на job_id.
+        """
+        index = cls()
+        jobs = pd.read_sql_query(f"SELECT job_id, {', '.join(JOB_ATTRIBUTES)} FROM jobs", engine)
+        index.add_jobs(jobs)
+        index.source = {**(source or {}), 'jobs_rows': len(jobs)}
+        benefits = pd.read_sql_query("SELECT job_id, type FROM job_benefits", engine)
+        index.add_benefits(benefits.assign(job_id=_align_ids(benefits['job_id'], jobs['job_id'])))
+        industries = pd.read_sql_query("""
+            SELECT ji.job_id, i.industry_name
+            FROM job_industries ji
+            JOIN industries i ON ji.industry_id = i.industry_id
+        """, engine)
+        index.add_industries(industries.assign(job_id=_align_ids(industries['job_id'], jobs['job_id'])))
+        return index
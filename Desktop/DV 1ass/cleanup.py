@@ -1,30 +1,24 @@
-
-import os
-from pathlib import Path
-from datetime import datetime, timedelta
 import argparse
 
-def cleanup_old_files(results_dir, charts_dir, days=7):
-    """Удаляет файлы старше N дней"""
-    cutoff_date = datetime.now() - timedelta(days=days)
-    deleted = {'csv': 0, 'png': 0}
-    
-    # Очистка CSV
-    results_path = Path(results_dir)
-    for file in results_path.glob("*.csv"):
-        if file.stat().st_mtime < cutoff_date.timestamp():
-            file.unlink()
-            deleted['csv'] += 1
-            print(f"🗑️  Удален CSV: {file.name}")
-    
-    # Очистка PNG
-    charts_path = Path(charts_dir)
-    for file in charts_path.glob("*.png"):
-        if file.stat().st_mtime < cutoff_date.timestamp():
-            file.unlink()
-            deleted['png'] += 1
-            print(f"🗑️  Удален PNG: {file.name}")
-    
+from output_store import OutputStore
+
+def cleanup_old_files(results_dir, charts_dir, days=7, keep_last=None, max_size_mb=None):
+    """Удаляет результаты по манифестам: старше N дней, сверх K запусков на отчет, сверх лимита размера"""
+    max_total_bytes = max_size_mb * 2**20 if max_size_mb is not None else None
+    deleted = {}
+
+    # Папки не обходим - все решения принимаются по manifest.json
+    # (кроме одноразового переноса файлов старого формата)
+    for kind, folder in (('csv', results_dir), ('png', charts_dir)):
+        store = OutputStore(folder)
+        adopted = store.adopt_legacy_files()
+        if adopted:
+            print(f"📥 {folder}: {adopted} файлов старого формата добавлено в манифест")
+        deleted[kind] = store.apply_retention(max_age_days=days, keep_last=keep_last,
+                                              max_total_bytes=max_total_bytes)
+        stats = store.stats()
+        print(f"🗂️  {folder}: осталось {stats['artifacts']} файлов, {stats['total_size'] / 2**20:.1f} МБ")
+
     print(f"\n✅ Очистка завершена!")
     print(f"   📊 Удалено CSV файлов: {deleted['csv']}")
     print(f"   🖼️  Удалено PNG файлов: {deleted['png']}")
@@ -32,9 +26,11 @@ def cleanup_old_files(results_dir, charts_dir, days=7):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Очистка старых файлов результатов")
     parser.add_argument("--days", type=int, default=7, help="Удалять файлы старше N дней")
+    parser.add_argument("--keep-last", type=int, default=None, help="Хранить только K последних запусков каждого отчета")
+    parser.add_argument("--max-size-mb", type=float, default=None, help="Ограничение общего размера папки, МБ")
     parser.add_argument("--results-dir", default="results", help="Папка с CSV")
     parser.add_argument("--charts-dir", default="charts", help="Папка с PNG")
-    
+
     args = parser.parse_args()
-    
-    cleanup_old_files(args.results_dir, args.charts_dir, args.days)
\ No newline at end of file
+
+    cleanup_old_files(args.results_dir, args.charts_dir, args.days, args.keep_last, args.max_size_mb)
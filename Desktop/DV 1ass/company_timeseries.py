@@ -0,0 +1,160 @@
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SECONDS_PER_DAY = 86400
+DEFAULT_WINDOW_DAYS = 180
+
+STATS_COLUMNS = ['snapshots', 'first_time', 'last_time', 'employee_count', 'follower_count',
+                 'employee_growth_pct', 'follower_velocity']
+
+
+def to_epoch_seconds(values):
+    """time_recorded → секунды Unix (в CSV это число, в схеме - TIMESTAMP)"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(np.int64).to_numpy()
+    return (pd.to_datetime(values).astype('datetime64[s]').astype(np.int64)).to_numpy()
+
+
+class CompanyTimeSeries:
+    """Снимки employee_counts по компаниям в отсортированных numpy-массивах
+
+    Для каждой компании хранятся массивы времени, сотрудников и подписчиков,
+    отсортированные по времени. Агрегаты за окно (рост штата, скорость
+    прироста подписчиков) пересчитываются только для компаний, по которым
+    пришли новые снимки, через searchsorted по их массивам.
+    Состояние сохраняется в pickle между запусками (save/load), новые
+    снимки догружаются по time_recorded >= last_raw_time, повторы отбрасываются.
+    source - маркер данных (run_id импорта, число строк до last_raw_time);
+    если он не совпадает с БД, ряды строятся заново.
+    """
+
+    def __init__(self, window_days=DEFAULT_WINDOW_DAYS):
+        self.window_seconds = window_days * SECONDS_PER_DAY
+        self.series = {}  # company_id → (times, employees, followers)
+        self.stats = None  # агрегаты по компаниям, индекс - company_id
+        self.last_raw_time = None
+        self.source = {}
+
+    def append(self, snapshots):
+        """Добавляет снимки (company_id, employee_count, follower_count, time_recorded)"""
+        snapshots = snapshots.dropna(subset=['company_id', 'time_recorded'])
+        if len(snapshots) == 0:
+            return []
+
+        raw_max = snapshots['time_recorded'].max()
+        self.last_raw_time = raw_max if self.last_raw_time is None else max(self.last_raw_time, raw_max)
+
+        times = to_epoch_seconds(snapshots['time_recorded'])
+        codes, uniques = pd.factorize(snapshots['company_id'])
+        order = np.lexsort((times, codes))
+        codes = codes[order]
+        times = times[order]
+        employees = pd.to_numeric(snapshots['employee_count'], errors='coerce').fillna(0).to_numpy(np.int64)[order]
+        followers = pd.to_numeric(snapshots['follower_count'], errors='coerce').fillna(0).to_numpy(np.int64)[order]
+
+        # Границы групп по компаниям в отсортированном пакете
+        touched_codes, starts = np.unique(codes, return_index=True)
+        ends = np.append(starts[1:], len(codes))
+        touched = [company_id for company_id, start, end in zip(uniques[touched_codes], starts, ends)
+                   if self._merge(company_id, times[start:end], employees[start:end], followers[start:end])]
+
+        if touched:
+            self._update_stats(touched)
+        return touched
+
+    def _merge(self, company_id, times, employees, followers):
+        """Дописывает снимки компании; полная сортировка - только если пришли «старые» точки
+
+        Уже известные снимки (то же время и те же значения) пропускаются.
+        Возвращает True, если ряд компании изменился.
+        """
+        if company_id not in self.series:
+            self.series[company_id] = (times, employees, followers)
+            return True
+        old_times, old_employees, old_followers = self.series[company_id]
+
+        # Повторы возможны только не позже последнего известного снимка
+        overlap = times <= old_times[-1]
+        if overlap.any():
+            lo = int(np.searchsorted(old_times, times[overlap].min(), side='left'))
+            known = set(zip(old_times[lo:].tolist(), old_employees[lo:].tolist(), old_followers[lo:].tolist()))
+            keep = ~overlap
+            keep[overlap] = [point not in known for point in zip(times[overlap].tolist(),
+                                                                 employees[overlap].tolist(),
+                                                                 followers[overlap].tolist())]
+            times, employees, followers = times[keep], employees[keep], followers[keep]
+            if len(times) == 0:
+                return False
+
+        times = np.concatenate([old_times, times])
+        employees = np.concatenate([old_employees, employees])
+        followers = np.concatenate([old_followers, followers])
+        if times[len(old_times) - 1] > times[len(old_times)]:
+            order = np.argsort(times, kind='stable')
+            times, employees, followers = times[order], employees[order], followers[order]
+        self.series[company_id] = (times, employees, followers)
+        return True
+
+    def _update_stats(self, companies):
+        """Пересчитывает агрегаты за окно только для указанных компаний"""
+        rows = {}
+        for company_id in companies:
+            times, employees, followers = self.series[company_id]
+            last = len(times) - 1
+            # Последний снимок не позже начала окна (или самый первый)
+            base = max(int(np.searchsorted(times, times[last] - self.window_seconds, side='right')) - 1, 0)
+            days = (times[last] - times[base]) / SECONDS_PER_DAY
+            growth = (100.0 * (employees[last] - employees[base]) / employees[base]
+                      if employees[base] > 0 and base < last else np.nan)
+            velocity = (followers[last] - followers[base]) / days if days > 0 else np.nan
+            rows[company_id] = [len(times), times[0], times[last], employees[last], followers[last], growth, velocity]
+
+        update = pd.DataFrame.from_dict(rows, orient='index', columns=STATS_COLUMNS)
+        if self.stats is None:
+            self.stats = update
+        else:
+            self.stats = pd.concat([self.stats.drop(index=update.index, errors='ignore'), update])
+
+    def is_current(self, source):
+        """Совпадает ли маркер рядов с текущим состоянием данных"""
+        # В рядах, сохраненных до появления маркера, атрибута source нет
+        stored = getattr(self, 'source', {})
+        return all(stored.get(key) == value for key, value in source.items())
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return path
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def fastest_growing(self, company_industries, job_counts=None, top_n=5, min_employees=10):
+        """Топ компаний по росту штата в каждой отрасли
+
+        company_industries: company_id, industry (и опционально company)
+        job_counts: Series company_id → число вакансий (для hiring_intensity)
+        """
+        if self.stats is None:
+            return pd.DataFrame()
+        stats = self.stats[(self.stats['employee_count'] >= min_employees) & self.stats['employee_growth_pct'].notna()]
+        df = stats.rename_axis('company_id').reset_index().merge(company_industries, on='company_id')
+        if job_counts is not None:
+            df['job_count'] = df['company_id'].map(job_counts).fillna(0).astype(int)
+            # Вакансий на 1000 сотрудников
+            df['hiring_intensity'] = (1000.0 * df['job_count'] / df['employee_count']).round(2)
+        df['employee_growth_pct'] = df['employee_growth_pct'].astype(float).round(2)
+        df['follower_velocity'] = df['follower_velocity'].astype(float).round(2)
+
+        df = df.sort_values(['industry', 'employee_growth_pct'], ascending=[True, False], kind='stable')
+        df = df.groupby('industry', sort=False).head(top_n)
+        columns = [col for col in ['company', 'industry', 'employee_count', 'employee_growth_pct',
+                                   'follower_velocity', 'job_count', 'hiring_intensity'] if col in df.columns]
+        return df[columns].reset_index(drop=True)
@@ -0,0 +1,111 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_name(value):
+    """Нормализует строку для сравнения: нижний регистр, только буквы/цифры"""
+    return _NON_ALNUM.sub(' ', str(value).lower()).strip()
+
+
+def char_ngrams(text, n=3):
+    """Множество символьных n-грамм строки (с пробелами по краям)"""
+    padded = f" {text} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class NGramResolver:
+    """Сопоставляет сырые строки со справочником через индекс символьных n-грамм
+
+    Кандидаты отбираются по инвертированному индексу n-грамма → кандидаты,
+    совпадения считаются одним np.bincount, оценка - коэффициент Дайса.
+    Результат кешируется по каждому уникальному сырому значению.
+    """
+
+    def __init__(self, names, ids, n=3, threshold=0.8):
+        self.n = n
+        self.threshold = threshold
+        self.ids = list(ids)
+        self.raw_names = list(names)
+        self.names = [normalize_name(name) for name in names]
+        self.exact = {}
+        for name, target_id in zip(self.names, self.ids):
+            self.exact.setdefault(name, target_id)
+
+        # Инвертированный индекс: n-грамма → номера кандидатов
+        postings = defaultdict(list)
+        sizes = []
+        for idx, name in enumerate(self.names):
+            grams = char_ngrams(name, n)
+            sizes.append(len(grams))
+            for gram in grams:
+                postings[gram].append(idx)
+        self.index = {gram: np.array(idxs, dtype=np.int32) for gram, idxs in postings.items()}
+        self.sizes = np.array(sizes, dtype=np.float64)
+        self.cache = {}
+
+    def match(self, value):
+        """Лучший кандидат для одного значения: (id, score, имя) или (None, 0.0, None)"""
+        key = normalize_name(value)
+        if key in self.cache:
+            return self.cache[key]
+
+        if key in self.exact:
+            result = (self.exact[key], 1.0, key)
+        else:
+            grams = char_ngrams(key, self.n)
+            hits = [self.index[gram] for gram in grams if gram in self.index]
+            result = (None, 0.0, None)
+            if hits:
+                shared = np.bincount(np.concatenate(hits), minlength=len(self.names))
+                scores = 2.0 * shared / (len(grams) + self.sizes)
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    result = (self.ids[best], float(scores[best]), self.names[best])
+        self.cache[key] = result
+        return result
+
+    def resolve(self, values):
+        """Сопоставляет Series значений; матчинг выполняется один раз на уникальную строку"""
+        uniques = pd.Series(values.dropna().unique())
+        matched = {raw: self.match(raw) for raw in uniques}
+        resolved_ids = values.map({raw: m[0] for raw, m in matched.items()})
+        scores = values.map({raw: m[1] for raw, m in matched.items()})
+        return resolved_ids, scores
+
+    def exact_lookup_rows(self, values, names=None):
+        """Строки, которые находил прежний маппинг: str.lower() + поиск в словаре"""
+        names = self.raw_names if names is None else list(names)
+        ids = self.ids[:len(names)]
+        mapping_dict = {}
+        for name, target_id in zip(names, ids):
+            if isinstance(name, str):
+                mapping_dict.setdefault(name.lower(), target_id)
+        return int(values.str.lower().map(mapping_dict).notna().sum())
+
+    def coverage_report(self, values, scores, label, before_names=None):
+        """Печатает покрытие маппинга до (прежний словарь по str.lower()) и после (n-граммы)
+
+        before_names - справочные имена прежнего словаря, начало списка names
+        резолвера (по умолчанию все имена)
+        """
+        total = len(values)
+        exact_rows = self.exact_lookup_rows(values, before_names)
+        mapped_rows = int((scores > 0).sum())
+        uniques = values.dropna().nunique()
+        pct = lambda x: 100.0 * x / total if total else 0.0
+
+        print(f"  📐 Покрытие маппинга {label}: {uniques:,} уникальных значений, {total:,} строк")
+        print(f"     до (словарь по str.lower()): {exact_rows:,} ({pct(exact_rows):.1f}%)")
+        print(f"     после (n-граммы, порог {self.threshold}): {mapped_rows:,} ({pct(mapped_rows):.1f}%)")
+
+        fuzzy = [(raw, m) for raw, m in self.cache.items() if 0.0 < m[1] < 1.0]
+        for raw, (_, score, name) in sorted(fuzzy, key=lambda item: item[1][1])[:5]:
+            print(f"     ~ '{raw}' → '{name}' ({score:.2f})")
+        return {'rows': total, 'unique_values': uniques, 'exact_rows': exact_rows, 'mapped_rows': mapped_rows}
@@ -0,0 +1,240 @@
+import json
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# Порог регрессии: стадия считается замедлившейся, если стала дольше в N раз
+REGRESSION_RATIO = 1.5
+# Игнорируем «регрессии» на коротких стадиях (шум таймера)
+REGRESSION_MIN_SECONDS = 1.0
+PROM_FILENAME = "linkedin_import.prom"
+LAST_RUN_FILENAME = "last_run.json"
+PEAK_RSS_NOTE = ("peak_rss_bytes - ru_maxrss, максимум RSS за всю жизнь процесса к концу стадии, "
+                 "а не пик самой стадии: рост значения показывает стадию, на которой максимум обновился")
+
+
+def peak_rss_bytes():
+    """Пиковый RSS процесса в байтах"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # На macOS ru_maxrss в байтах, на Linux - в килобайтах
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def frame_memory_bytes(df):
+    """Объем памяти DataFrame с учетом строковых колонок"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+class StageRecord:
+    """Метрики одной стадии импорта"""
+
+    def __init__(self, table, stage, bytes_read=0):
+        self.table = table
+        self.stage = stage
+        self.bytes_read = bytes_read
+        self.rows = 0
+        self.frame_bytes = 0
+        self.wall_seconds = 0.0
+        self.peak_rss_bytes = 0
+        self.ok = True
+
+    def track(self, df):
+        """Запоминает размер DataFrame после стадии"""
+        self.rows = len(df)
+        self.frame_bytes = frame_memory_bytes(df)
+        return df
+
+    def to_dict(self):
+        rows_per_sec = self.rows / self.wall_seconds if self.wall_seconds > 0 else 0.0
+        return {
+            'table': self.table,
+            'stage': self.stage,
+            'wall_seconds': round(self.wall_seconds, 4),
+            'rows': self.rows,
+            'rows_per_sec': round(rows_per_sec, 1),
+            'bytes_read': self.bytes_read,
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'frame_bytes': self.frame_bytes,
+            'ok': self.ok,
+        }
+
+
+class ImportMetrics:
+    """Сбор метрик по стадиям импорта: JSON-отчет, Prometheus-файл и сравнение с прошлым запуском"""
+
+    def __init__(self, metrics_dir):
+        self.metrics_dir = Path(metrics_dir)
+        self.metrics_dir.mkdir(parents=True, exist_ok=True)
+        self.started_at = datetime.now()
+        self.run_id = self.started_at.strftime('%Y%m%d_%H%M%S')
+        self.stages = []
+        self.running_stage = None
+        # Базу для сравнения читаем в начале: last_run.json обновляется только завершенным запуском
+        self.previous = self.load_previous_report()
+        self.log_path = self.metrics_dir / f"import_run_{self.run_id}.jsonl"
+        self.report_path = self.metrics_dir / f"import_run_{self.run_id}.json"
+
+    @contextmanager
+    def stage(self, table, stage, bytes_read=0):
+        """Замеряет время и память стадии; в блоке вызовите record.track(df)
+
+        Начало и конец стадии сразу пишутся на диск (JSONL-лог, частичный отчет
+        и .prom), чтобы после OOM-kill было видно, на какой стадии умер импорт.
+        """
+        record = StageRecord(table, stage, bytes_read)
+        self.running_stage = {'table': table, 'stage': stage}
+        self.append_log({'event': 'start', **self.running_stage,
+                         'time': datetime.now().isoformat(timespec='seconds')})
+        self.flush()
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception:
+            record.ok = False
+            raise
+        finally:
+            record.wall_seconds = time.perf_counter() - start
+            record.peak_rss_bytes = peak_rss_bytes()
+            self.stages.append(record)
+            self.running_stage = None
+            self.append_log({'event': 'end', **record.to_dict()})
+            self.flush()
+            print(f"  ⏱️  [{stage}] {record.wall_seconds:.2f} с, {record.rows:,} строк, "
+                  f"DataFrame {record.frame_bytes / 2**20:.1f} МБ, пик RSS {record.peak_rss_bytes / 2**20:.0f} МБ")
+
+    def append_log(self, event):
+        """Дописывает событие в JSONL-лог запуска и сбрасывает его на диск"""
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def build_report(self, completed=False):
+        """Формирует отчет о запуске (completed=False - запуск еще идет или прерван)"""
+        stages = [record.to_dict() for record in self.stages]
+        return {
+            'run_id': self.run_id,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'completed': completed,
+            'running_stage': self.running_stage,
+            'total_seconds': round(sum(s['wall_seconds'] for s in stages), 4),
+            'peak_rss_bytes': max((s['peak_rss_bytes'] for s in stages), default=0),
+            'peak_rss_note': PEAK_RSS_NOTE,
+            'stages': stages,
+        }
+
+    def flush(self, completed=False):
+        """Атомарно переписывает отчет запуска и .prom по уже завершенным стадиям"""
+        report = self.build_report(completed)
+        report['regressions'] = self.compare_with(self.previous, report)
+        self.write_atomic(self.report_path, json.dumps(report, ensure_ascii=False, indent=2))
+        self.write_atomic(self.metrics_dir / PROM_FILENAME, self.to_prometheus(report, report['regressions']))
+        return report
+
+    def load_previous_report(self):
+        """Читает отчет предыдущего запуска, если он есть"""
+        path = self.metrics_dir / LAST_RUN_FILENAME
+        if not path.exists():
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Не удалось прочитать прошлый отчет {path.name}: {e}")
+            return None
+
+    def compare_with(self, previous, report):
+        """Сравнивает стадии с прошлым запуском и возвращает список регрессий"""
+        if not previous:
+            return []
+        prev_stages = {(s['table'], s['stage']): s for s in previous.get('stages', [])}
+        regressions = []
+
+        def check(table, stage, metric, old, new):
+            if old <= 0 or new <= old * REGRESSION_RATIO:
+                return
+            if metric == 'wall_seconds' and new < REGRESSION_MIN_SECONDS:
+                return
+            regressions.append({
+                'table': table,
+                'stage': stage,
+                'metric': metric,
+                'previous': old,
+                'current': new,
+                'ratio': round(new / old, 2),
+            })
+
+        for s in report['stages']:
+            prev = prev_stages.get((s['table'], s['stage']))
+            if prev is None:
+                continue
+            for metric in ('wall_seconds', 'frame_bytes', 'peak_rss_bytes'):
+                check(s['table'], s['stage'], metric, prev.get(metric, 0), s[metric])
+        # Пик RSS всего запуска - главный сигнал перед OOM
+        check('*', 'run', 'peak_rss_bytes', previous.get('peak_rss_bytes', 0), report['peak_rss_bytes'])
+        return regressions
+
+    def to_prometheus(self, report, regressions):
+        """Отчет в текстовом формате Prometheus (для textfile collector node_exporter)"""
+        gauges = [
+            ('linkedin_import_stage_seconds', 'wall_seconds', 'Wall time of an import stage'),
+            ('linkedin_import_stage_rows', 'rows', 'Rows after an import stage'),
+            ('linkedin_import_stage_rows_per_second', 'rows_per_sec', 'Import stage throughput'),
+            ('linkedin_import_stage_bytes_read', 'bytes_read', 'Bytes read from disk by an import stage'),
+            ('linkedin_import_stage_peak_rss_bytes', 'peak_rss_bytes',
+             'Process lifetime peak RSS (ru_maxrss) at the end of an import stage, not a per-stage peak'),
+            ('linkedin_import_stage_frame_bytes', 'frame_bytes', 'DataFrame memory footprint after an import stage'),
+        ]
+        lines = []
+        for metric, key, help_text in gauges:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for s in report['stages']:
+                lines.append(f'{metric}{{table="{s["table"]}",stage="{s["stage"]}"}} {s[key]}')
+        if report['running_stage']:
+            running = report['running_stage']
+            lines.append("# HELP linkedin_import_stage_running Import stage currently in progress")
+            lines.append("# TYPE linkedin_import_stage_running gauge")
+            lines.append(f'linkedin_import_stage_running{{table="{running["table"]}",stage="{running["stage"]}"}} 1')
+        lines.append("# HELP linkedin_import_run_completed 1 if the last import run finished, 0 if running or died")
+        lines.append("# TYPE linkedin_import_run_completed gauge")
+        lines.append(f"linkedin_import_run_completed {int(report['completed'])}")
+        lines.append("# HELP linkedin_import_run_peak_rss_bytes Process peak RSS over the import run")
+        lines.append("# TYPE linkedin_import_run_peak_rss_bytes gauge")
+        lines.append(f"linkedin_import_run_peak_rss_bytes {report['peak_rss_bytes']}")
+        lines.append("# HELP linkedin_import_run_seconds Total wall time of the import run")
+        lines.append("# TYPE linkedin_import_run_seconds gauge")
+        lines.append(f"linkedin_import_run_seconds {report['total_seconds']}")
+        lines.append("# HELP linkedin_import_regressions Stages slower or bigger than in the previous run")
+        lines.append("# TYPE linkedin_import_regressions gauge")
+        lines.append(f"linkedin_import_regressions {len(regressions)}")
+        lines.append("# HELP linkedin_import_last_run_timestamp_seconds Start time of the last import run")
+        lines.append("# TYPE linkedin_import_last_run_timestamp_seconds gauge")
+        lines.append(f"linkedin_import_last_run_timestamp_seconds {int(self.started_at.timestamp())}")
+        return "\n".join(lines) + "\n"
+
+    def write_atomic(self, path, content):
+        """Пишет файл атомарно, чтобы экспортер не прочитал его наполовину"""
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def finish(self):
+        """Сохраняет JSON-отчет и Prometheus-файл, выводит регрессии"""
+        report = self.flush(completed=True)
+        regressions = report['regressions']
+        self.write_atomic(self.metrics_dir / LAST_RUN_FILENAME, json.dumps(report, ensure_ascii=False, indent=2))
+
+        print(f"\n📈 Метрики импорта: {report['total_seconds']:.1f} с, пик RSS {report['peak_rss_bytes'] / 2**20:.0f} МБ")
+        print(f"   JSON: {self.report_path} (лог стадий: {self.log_path.name})")
+        print(f"   Prometheus: {self.metrics_dir / PROM_FILENAME}")
+        if regressions:
+            print(f"⚠️  Регрессии относительно прошлого запуска: {len(regressions)}")
+            for r in regressions:
+                print(f"   • {r['table']}/{r['stage']} {r['metric']}: {r['previous']} → {r['current']} (x{r['ratio']})")
+        return report
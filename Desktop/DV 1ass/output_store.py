@@ -0,0 +1,254 @@
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+
+MANIFEST_NAME = "manifest.json"
+RUN_LOG_NAME = "runs.jsonl"
+# Через сколько записей журнала манифест переписывается целиком
+COMPACT_EVERY = 500
+# Файлы до перехода на хранилище: <отчет>_YYYYMMDD_HHMMSS.csv/png
+LEGACY_FILE_RE = re.compile(r'^(?P<report>.+)_(?P<stamp>\d{8}_\d{6})\.(?P<ext>csv|png)$')
+
+
+def content_hash(*parts):
+    """SHA-256 от набора байтовых/строковых частей"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class OutputStore:
+    """Хранилище артефактов (CSV/PNG) с адресацией по содержимому
+
+    manifest.json в папке хранилища:
+      artifacts - hash → файл, размер, число ссылок
+      runs      - записи «отчет + запуск → hash» в порядке добавления
+    Новые записи дописываются строкой в журнал runs.jsonl, манифест
+    переписывается целиком только при compact() (раз в COMPACT_EVERY
+    записей, после очистки и в конце анализа).
+    Одинаковое содержимое записывается один раз, а очистка работает
+    по манифесту, без обхода файлов в папке.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.root_dir / MANIFEST_NAME
+        self.log_path = self.root_dir / RUN_LOG_NAME
+        self.manifest = self.load_manifest()
+        self.log_entries = 0
+        self.replay_log()
+        # Число записей runs по отчетам - keep_last не пересчитывает его обходом
+        self.report_counts = {}
+        for entry in self.manifest['runs']:
+            self.report_counts[entry['report']] = self.report_counts.get(entry['report'], 0) + 1
+
+    def load_manifest(self):
+        """Читает манифест или создает пустой"""
+        if self.manifest_path.exists():
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        return {'artifacts': {}, 'runs': [], 'total_size': 0}
+
+    def replay_log(self):
+        """Применяет к манифесту записи журнала, сделанные после последнего compact()"""
+        if not self.log_path.exists():
+            return
+        with open(self.log_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Недописанная строка после аварийного завершения
+                    continue
+                self.apply_entry(entry)
+                self.log_entries += 1
+
+    def apply_entry(self, entry):
+        """Добавляет запись запуска (и новый артефакт, если он в ней есть) в манифест"""
+        entry = dict(entry)
+        artifact = entry.pop('artifact', None)
+        artifacts = self.manifest['artifacts']
+        if artifact is not None and entry['hash'] not in artifacts:
+            # Копия: запись журнала должна остаться с refs=0, ссылки считаются при повторе журнала
+            artifacts[entry['hash']] = dict(artifact)
+            self.manifest['total_size'] += artifact['size']
+        artifacts[entry['hash']]['refs'] += 1
+        self.manifest['runs'].append(entry)
+        return entry
+
+    def save_manifest(self):
+        """Атомарно сохраняет манифест"""
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+
+    def compact(self):
+        """Переписывает манифест и очищает журнал"""
+        self.save_manifest()
+        if self.log_path.exists():
+            self.log_path.unlink()
+        self.log_entries = 0
+
+    def append_log(self, entry):
+        """Дописывает запись в журнал; при разрастании журнала - compact()"""
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.log_entries += 1
+        if self.log_entries >= COMPACT_EVERY:
+            self.compact()
+
+    def has(self, digest):
+        return digest in self.manifest['artifacts']
+
+    def path_for(self, digest):
+        return self.root_dir / self.manifest['artifacts'][digest]['file']
+
+    def add(self, report, run_id, digest, ext, data=None, name=None):
+        """Регистрирует артефакт отчета в запуске; файл пишется, только если hash новый
+
+        Возвращает (путь, записан_ли_файл).
+        """
+        entry = {'report': report, 'run': run_id, 'hash': digest,
+                 'time': datetime.now().isoformat(timespec='seconds')}
+        written = False
+        if digest not in self.manifest['artifacts']:
+            if data is None:
+                raise ValueError(f"Нет данных для нового артефакта {digest[:12]}")
+            filename = f"{name or 'artifact'}_{digest[:12]}.{ext}"
+            tmp_path = self.root_dir / (filename + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.root_dir / filename)
+            entry['artifact'] = {'file': filename, 'size': len(data), 'refs': 0, 'created': entry['time']}
+            written = True
+
+        self.apply_entry(entry)
+        self.report_counts[report] = self.report_counts.get(report, 0) + 1
+        self.append_log(entry)
+        return self.path_for(digest), written
+
+    def latest(self, report):
+        """Путь к последнему артефакту отчета или None"""
+        for entry in reversed(self.manifest['runs']):
+            if entry['report'] == report:
+                return self.path_for(entry['hash'])
+        return None
+
+    def release(self, entry):
+        """Убирает запись запуска; файл удаляется, когда на него не осталось ссылок"""
+        self.report_counts[entry['report']] -= 1
+        artifact = self.manifest['artifacts'].get(entry['hash'])
+        if artifact is None:
+            return 0
+        artifact['refs'] -= 1
+        if artifact['refs'] > 0:
+            return 0
+        try:
+            (self.root_dir / artifact['file']).unlink()
+        except FileNotFoundError:
+            pass
+        self.manifest['total_size'] -= artifact['size']
+        del self.manifest['artifacts'][entry['hash']]
+        return 1
+
+    def apply_retention(self, max_age_days=None, keep_last=None, max_total_bytes=None):
+        """Очистка по возрасту, по числу запусков на отчет и по общему размеру
+
+        Записи runs упорядочены по времени, поэтому очистка по возрасту и размеру
+        снимает записи с начала списка и трогает только удаляемое.
+        Возвращает число удаленных файлов.
+        """
+        runs = self.manifest['runs']
+        removed = 0
+        drop_from = 0
+
+        # По возрасту: все записи до первой достаточно свежей
+        if max_age_days is not None:
+            cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat(timespec='seconds')
+            while drop_from < len(runs) and runs[drop_from]['time'] < cutoff:
+                removed += self.release(runs[drop_from])
+                drop_from += 1
+
+        # По общему размеру: самые старые записи, пока не уложимся в лимит
+        if max_total_bytes is not None:
+            while drop_from < len(runs) and self.manifest['total_size'] > max_total_bytes:
+                removed += self.release(runs[drop_from])
+                drop_from += 1
+
+        runs = runs[drop_from:]
+
+        # По количеству: у каждого отчета сверх keep_last снимаем самые старые записи.
+        # Лишнее известно по report_counts, поэтому список проходится только до
+        # последней удаляемой записи, а если превышений нет - не проходится вовсе
+        if keep_last is not None:
+            excess = {report: count - keep_last for report, count in self.report_counts.items()
+                      if count > keep_last}
+            kept = []
+            pos = 0
+            while excess and pos < len(runs):
+                entry = runs[pos]
+                pos += 1
+                if entry['report'] in excess:
+                    removed += self.release(entry)
+                    excess[entry['report']] -= 1
+                    if excess[entry['report']] == 0:
+                        del excess[entry['report']]
+                else:
+                    kept.append(entry)
+            runs = kept + runs[pos:]
+
+        self.manifest['runs'] = runs
+        self.compact()
+        return removed
+
+    def adopt_legacy_files(self):
+        """Один раз переносит в манифест файлы <отчет>_YYYYMMDD_HHMMSS.csv/png
+
+        Такие файлы остались от версий до хранилища и иначе не попадают под очистку.
+        Время записи берется из имени файла; файл с уже известным содержимым
+        удаляется, запись ссылается на существующий артефакт.
+        Возвращает число перенесенных файлов.
+        """
+        if self.manifest.get('legacy_adopted'):
+            return 0
+
+        known_files = {artifact['file'] for artifact in self.manifest['artifacts'].values()}
+        legacy = []
+        for path in self.root_dir.iterdir():
+            match = LEGACY_FILE_RE.match(path.name)
+            if match is None or path.name in known_files or not path.is_file():
+                continue
+            stamp = datetime.strptime(match['stamp'], '%Y%m%d_%H%M%S')
+            legacy.append((stamp, match['report'], path))
+
+        entries = []
+        for stamp, report, path in sorted(legacy):
+            data = path.read_bytes()
+            digest = content_hash(data)
+            artifacts = self.manifest['artifacts']
+            if digest in artifacts:
+                path.unlink()
+            else:
+                artifacts[digest] = {'file': path.name, 'size': len(data), 'refs': 0,
+                                     'created': stamp.isoformat(timespec='seconds')}
+                self.manifest['total_size'] += len(data)
+            artifacts[digest]['refs'] += 1
+            entries.append({'report': report, 'run': stamp.strftime('%Y%m%d_%H%M%S'), 'hash': digest,
+                            'time': stamp.isoformat(timespec='seconds')})
+            self.report_counts[report] = self.report_counts.get(report, 0) + 1
+
+        # Старые файлы - в начало runs, чтобы порядок по времени сохранился
+        self.manifest['runs'] = entries + self.manifest['runs']
+        self.manifest['legacy_adopted'] = True
+        self.compact()
+        return len(entries)
+
+    def stats(self):
+        return {'artifacts': len(self.manifest['artifacts']), 'runs': len(self.manifest['runs']),
+                'total_size': self.manifest['total_size']}
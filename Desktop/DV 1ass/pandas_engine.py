@@ -0,0 +1,245 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from salary_stats import REPORT_CURRENCY, build_salary_distributions
+
+# Какие таблицы и колонки нужны для отчетов
+SNAPSHOT_TABLES = {
+    'companies': "SELECT company_id, name, city, country FROM companies",
+    'jobs': """SELECT job_id, company_id, location, views, applies, remote_allowed,
+                      formatted_experience_level FROM jobs""",
+    'skills': "SELECT skill_id, skill_abr, skill_name FROM skills",
+    'job_skills': "SELECT job_id, skill_id FROM job_skills",
+    'industries': "SELECT industry_id, industry_name FROM industries",
+    'job_industries': "SELECT job_id, industry_id FROM job_industries",
+    'salaries': "SELECT job_id, annual_salary, currency FROM salaries",
+}
+
+# Ключ → (справочная таблица, таблицы, где ключ встречается)
+KEY_DOMAINS = {
+    'job_id': ('jobs', ['job_skills', 'job_industries', 'salaries']),
+    'company_id': ('companies', ['jobs']),
+    'skill_id': ('skills', ['job_skills']),
+    'industry_id': ('industries', ['job_industries']),
+}
+# Факт-таблицы, которые читаются и без JOIN по ключу (COUNT(*) FROM jobs, AVG по salaries):
+# строки с ключом не из справочника (код -1) в них остаются, из остальных удаляются, как при INNER JOIN
+STANDALONE_FACTS = {('jobs', 'company_id'), ('salaries', 'job_id')}
+CATEGORY_COLUMNS = {'jobs': ['location', 'formatted_experience_level'], 'salaries': ['currency']}
+
+EXPERIENCE_ORDER = ['internship', 'entry', 'associate', 'mid', 'senior']
+
+
+def experience_rank(levels):
+    """Порядок уровней опыта как в SQL-отчете (CASE ... ILIKE)"""
+    lower = levels.astype(str).str.lower()
+    rank = pd.Series(len(EXPERIENCE_ORDER) + 1, index=levels.index)
+    for i, marker in reversed(list(enumerate(EXPERIENCE_ORDER, 1))):
+        rank = rank.mask(lower.str.contains(marker, regex=False), i)
+    return rank
+
+
+class PandasAnalysisEngine:
+    """Отчеты run_full_analysis на pandas по одному снимку таблиц в памяти
+
+    Строковые ключи (job_id, company_id, skill_id, industry_id) заменяются
+    целочисленными кодами, повторяющиеся строки - категориями.
+    """
+
+    def __init__(self, tables, encoded=False):
+        self.tables = {name: df.copy() for name, df in tables.items()}
+        if not encoded:
+            self.encode()
+        self._distributions = None
+
+    @classmethod
+    def from_database(cls, engine):
+        """Загружает снимок таблиц из БД"""
+        return cls({name: pd.read_sql_query(sql, engine) for name, sql in SNAPSHOT_TABLES.items()})
+
+    @classmethod
+    def from_snapshot(cls, path):
+        """Загружает снимок, сохраненный save_snapshot (работает без доступа к БД)"""
+        path = Path(path)
+        return cls({name: pd.read_pickle(path / f"{name}.pkl") for name in SNAPSHOT_TABLES}, encoded=True)
+
+    def save_snapshot(self, path):
+        """Сохраняет закодированный снимок таблиц"""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name, df in self.tables.items():
+            df.to_pickle(path / f"{name}.pkl")
+        return path
+
+    def encode(self):
+        """Переводит ключи в int32-коды, строковые атрибуты - в category"""
+        for key, (dim_table, fact_tables) in KEY_DOMAINS.items():
+            categories = pd.Index(self.tables[dim_table][key].dropna().unique())
+            for name in [dim_table] + fact_tables:
+                codes = pd.Categorical(self.tables[name][key], categories=categories).codes
+                self.tables[name][key] = codes.astype(np.int32)
+                # Иначе «сироты» разных таблиц соединились бы между собой по коду -1
+                if name != dim_table and (name, key) not in STANDALONE_FACTS:
+                    self.tables[name] = self.tables[name][codes >= 0].reset_index(drop=True)
+        for name, columns in CATEGORY_COLUMNS.items():
+            for col in columns:
+                self.tables[name][col] = self.tables[name][col].astype('category')
+        jobs = self.tables['jobs']
+        jobs['remote_allowed'] = jobs['remote_allowed'].fillna(False).astype(bool)
+        for col in ('views', 'applies'):
+            jobs[col] = pd.to_numeric(jobs[col], errors='coerce').fillna(0).astype(np.int64)
+
+    def memory_bytes(self):
+        return sum(int(df.memory_usage(deep=True).sum()) for df in self.tables.values())
+
+    def salary_distributions(self):
+        """Квантили зарплат тем же кодом, что и при импорте (salary_stats)"""
+        if self._distributions is None:
+            job_industries = self.tables['job_industries'].merge(self.tables['industries'], on='industry_id')
+            # Категории обратно в строки, чтобы groupby не порождал пустые группы
+            salaries = self.tables['salaries'].assign(currency=self.tables['salaries']['currency'].astype(object))
+            jobs = self.tables['jobs'].astype({'location': object, 'formatted_experience_level': object})
+            quantiles, _ = build_salary_distributions(salaries, jobs, job_industries)
+            self._distributions = quantiles[quantiles['currency'] == REPORT_CURRENCY]
+        return self._distributions
+
+    def salary_dimension(self, dimension):
+        df = self.salary_distributions()
+        return df[df['dimension'] == dimension]
+
+    def top_skills(self):
+        jobs = self.tables['jobs']
+        df = (self.tables['job_skills']
+              .merge(self.tables['skills'], on='skill_id')
+              .merge(jobs[jobs['views'] > 0][['job_id', 'views', 'applies']], on='job_id'))
+        df['ratio'] = df['applies'] / df['views']
+        result = (df.groupby(['skill_id', 'skill_name', 'skill_abr'])
+                    .agg(job_count=('job_id', 'nunique'), apply_ratio=('ratio', 'mean'))
+                    .reset_index()
+                    .rename(columns={'skill_name': 'skill'}))
+        result['apply_ratio'] = result['apply_ratio'].round(4)
+        result = result.sort_values('job_count', ascending=False, kind='stable').head(10)
+        return result[['skill', 'skill_abr', 'job_count', 'apply_ratio']].reset_index(drop=True)
+
+    def salaries_by_industry(self):
+        df = self.salary_dimension('industry')
+        df = df[df['job_count'] > 10].rename(columns={'dimension_value': 'industry'})
+        df = df.sort_values('avg_salary', ascending=False, kind='stable').head(15)
+        result = df[['industry', 'job_count', 'avg_salary', 'min_salary', 'max_salary']].copy()
+        result[['avg_salary', 'min_salary', 'max_salary']] = result[['avg_salary', 'min_salary', 'max_salary']].round(0)
+        return result.reset_index(drop=True)
+
+    def active_companies(self):
+        salaries = self.tables['salaries']
+        salaries = salaries.loc[salaries['currency'] == REPORT_CURRENCY, ['job_id', 'annual_salary']]
+        df = (self.tables['companies']
+              .merge(self.tables['jobs'][['job_id', 'company_id', 'views', 'applies']], on='company_id')
+              .merge(salaries, on='job_id', how='left'))
+        result = (df.groupby('company_id')
+                    .agg(company=('name', 'first'), city=('city', 'first'), country=('country', 'first'),
+                         total_jobs=('job_id', 'size'), avg_salary=('annual_salary', 'mean'),
+                         total_applies=('applies', 'sum'), avg_views=('views', 'mean'))
+                    .reset_index(drop=True))
+        result = result[result['total_jobs'] > 20].copy()
+        result[['avg_salary', 'avg_views']] = result[['avg_salary', 'avg_views']].round(0)
+        return result.sort_values('total_jobs', ascending=False, kind='stable').head(20).reset_index(drop=True)
+
+    def remote_share_by_industry(self):
+        jobs = self.tables['jobs'][['job_id', 'remote_allowed']]
+        df = (self.tables['job_industries'][['job_id', 'industry_id']].drop_duplicates()
+              .merge(self.tables['industries'], on='industry_id')
+              .merge(jobs, on='job_id'))
+        result = (df.groupby(['industry_id', 'industry_name'])
+                    .agg(total_jobs=('job_id', 'size'), remote_jobs=('remote_allowed', 'sum'))
+                    .reset_index()
+                    .rename(columns={'industry_name': 'industry'}))
+        result = result[result['total_jobs'] > 50].copy()
+        result['remote_percentage'] = (100.0 * result['remote_jobs'] / result['total_jobs']).round(1)
+        result = result.sort_values('remote_percentage', ascending=False, kind='stable').head(15)
+        return result[['industry', 'total_jobs', 'remote_jobs', 'remote_percentage']].reset_index(drop=True)
+
+    def salaries_by_experience(self):
+        df = self.salary_dimension('experience_level').rename(columns={'dimension_value': 'experience_level'})
+        df = df.assign(rank=experience_rank(df['experience_level'])).sort_values('rank', kind='stable')
+        result = df[['experience_level', 'job_count', 'avg_salary', 'q25_salary', 'q75_salary']].copy()
+        result[['avg_salary', 'q25_salary', 'q75_salary']] = result[['avg_salary', 'q25_salary', 'q75_salary']].round(0)
+        return result.reset_index(drop=True)
+
+    def salaries_by_region(self):
+        df = self.salary_dimension('region')
+        df = df[df['job_count'] > 30].rename(columns={'dimension_value': 'region'})
+        df = df.sort_values('avg_salary', ascending=False, kind='stable').head(20)
+        result = df[['region', 'job_count', 'avg_salary', 'min_salary', 'max_salary']].copy()
+        result['avg_salary'] = result['avg_salary'].round(0)
+        result[['min_salary', 'max_salary']] = result[['min_salary', 'max_salary']].round(0).astype(int)
+        return result.reset_index(drop=True)
+
+    def recruiting_efficiency(self):
+        jobs = self.tables['jobs']
+        jobs = jobs[(jobs['views'] > 0) & (jobs['applies'] > 0)]
+        df = self.tables['companies'][['company_id', 'name']].merge(
+            jobs[['job_id', 'company_id', 'views', 'applies']], on='company_id')
+        df['ratio'] = df['applies'] / df['views']
+        result = (df.groupby('company_id')
+                    .agg(company_name=('name', 'first'), total_jobs=('job_id', 'size'),
+                         total_views=('views', 'sum'), total_applies=('applies', 'sum'),
+                         apply_to_view_ratio=('ratio', 'mean'), avg_views_per_job=('views', 'mean'))
+                    .reset_index(drop=True))
+        result = result[result['total_jobs'] > 10].copy()
+        result['apply_to_view_ratio'] = result['apply_to_view_ratio'].round(4)
+        result['avg_views_per_job'] = result['avg_views_per_job'].round(0)
+        result = result.sort_values('apply_to_view_ratio', ascending=False, kind='stable').head(15)
+        return result.reset_index(drop=True)
+
+    REPORTS = {
+        'top_skills': top_skills,
+        'salaries_by_industry': salaries_by_industry,
+        'active_companies': active_companies,
+        'remote_share_by_industry': remote_share_by_industry,
+        'salaries_by_experience': salaries_by_experience,
+        'salaries_by_region': salaries_by_region,
+        'recruiting_efficiency': recruiting_efficiency,
+    }
+
+    def run(self, report_key):
+        """Считает отчет по ключу из REPORTS"""
+        if report_key not in self.REPORTS:
+            raise KeyError(f"Отчет '{report_key}' не поддерживается pandas-движком")
+        return self.REPORTS[report_key](self)
+
+    def summary_stats(self):
+        """Та же базовая статистика, что и SQL-запрос в print_summary_stats"""
+        salaries = self.tables['salaries']
+        usd = salaries.loc[salaries['currency'] == REPORT_CURRENCY, 'annual_salary']
+        return pd.Series({
+            'total_companies': len(self.tables['companies']),
+            'total_jobs': len(self.tables['jobs']),
+            'total_skills': len(self.tables['skills']),
+            'total_industries': len(self.tables['industries']),
+            'avg_salary_all': round(usd.mean(), 0),
+        }, dtype=object)
+
+
+def compare_frames(expected, actual, rtol=1e-3, atol=1e-4):
+    """Сравнивает два результата отчета без учета порядка строк; возвращает список расхождений"""
+    problems = []
+    if list(expected.columns) != list(actual.columns):
+        return [f"колонки: {list(expected.columns)} ≠ {list(actual.columns)}"]
+    if len(expected) != len(actual):
+        problems.append(f"строк: {len(expected)} ≠ {len(actual)}")
+
+    columns = list(expected.columns)
+    left = expected.sort_values(columns, kind='stable').reset_index(drop=True)
+    right = actual.sort_values(columns, kind='stable').reset_index(drop=True)
+    rows = min(len(left), len(right))
+    for col in columns:
+        a, b = left[col].head(rows), right[col].head(rows)
+        if pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b):
+            same = np.isclose(a.astype(float), b.astype(float), rtol=rtol, atol=atol, equal_nan=True)
+        else:
+            same = (a.astype(str) == b.astype(str)).to_numpy()
+        if not same.all():
+            problems.append(f"{col}: {int((~same).sum())} значений отличаются")
+    return problems
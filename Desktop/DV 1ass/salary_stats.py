@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# Множители для приведения зарплаты к годовой (pay_period из salaries.csv)
+PAY_PERIOD_MULTIPLIERS = {
+    'HOURLY': 2080,    # 40 часов × 52 недели
+    'WEEKLY': 52,
+    'BIWEEKLY': 26,
+    'MONTHLY': 12,
+    'YEARLY': 1,
+}
+
+# Валюта, в которой строятся отчеты
+REPORT_CURRENCY = 'USD'
+
+# Общие границы корзин гистограммы (годовая зарплата), последняя корзина - «и выше»
+HISTOGRAM_EDGES = np.append(np.arange(0, 500_001, 20_000), np.inf)
+
+QUANTILE_COLUMNS = ['dimension', 'dimension_value', 'currency', 'job_count', 'avg_salary',
+                    'min_salary', 'q25_salary', 'median_salary', 'q75_salary', 'max_salary']
+HISTOGRAM_COLUMNS = ['dimension', 'dimension_value', 'currency', 'bin_lower', 'bin_upper', 'job_count']
+
+
+def annualize_salaries(df):
+    """Добавляет годовую зарплату annual_salary (NULL, если посчитать нельзя)"""
+    base = df['med_salary']
+    # Если медианы нет - берем середину вилки min/max
+    midpoint = (df['min_salary'] + df['max_salary']) / 2
+    base = base.where(base > 0, midpoint)
+
+    multiplier = df['pay_period'].astype(str).str.strip().str.upper().map(PAY_PERIOD_MULTIPLIERS)
+    annual = base * multiplier
+    df['annual_salary'] = annual.where(annual > 0).round(2)
+    # Валюта без тега считается валютой отчетов - правило фиксируется здесь, при импорте
+    currency = df['currency'].astype(str).str.strip().str.upper().where(df['currency'].notna())
+    df['currency'] = currency.replace('', np.nan).fillna(REPORT_CURRENCY)
+    return df
+
+
+def extract_region(location):
+    """Регион из location: часть до первой запятой (как в SQL-отчете)"""
+    location = location.astype('string')
+    return location.where(~location.str.contains(', ', regex=False, na=False),
+                          location.str.split(',', n=1).str[0])
+
+
+def describe_salaries(df, dimension, value_col):
+    """Квантильная сводка annual_salary по значениям одного измерения"""
+    df = df[df[value_col].notna()].drop_duplicates(subset=['job_id', value_col])
+    if len(df) == 0:
+        return pd.DataFrame(columns=QUANTILE_COLUMNS)
+
+    grouped = df.groupby([value_col, 'currency'])['annual_salary']
+    summary = grouped.agg(job_count='count', avg_salary='mean', min_salary='min', max_salary='max')
+    quantiles = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    quantiles.columns = ['q25_salary', 'median_salary', 'q75_salary']
+
+    summary = summary.join(quantiles).reset_index().rename(columns={value_col: 'dimension_value'})
+    summary.insert(0, 'dimension', dimension)
+    return summary[QUANTILE_COLUMNS]
+
+
+def histogram_salaries(df, dimension, value_col):
+    """Гистограмма annual_salary по общим корзинам HISTOGRAM_EDGES"""
+    df = df[df[value_col].notna()].drop_duplicates(subset=['job_id', value_col])
+    if len(df) == 0:
+        return pd.DataFrame(columns=HISTOGRAM_COLUMNS)
+
+    bins = np.searchsorted(HISTOGRAM_EDGES, df['annual_salary'].to_numpy(), side='right') - 1
+    counts = (df.assign(bin=bins)
+                .groupby([value_col, 'currency', 'bin'])
+                .size()
+                .reset_index(name='job_count')
+                .rename(columns={value_col: 'dimension_value'}))
+    counts['bin_lower'] = HISTOGRAM_EDGES[counts['bin']]
+    # Верхняя граница последней корзины открыта - храним NULL
+    counts['bin_upper'] = pd.Series(HISTOGRAM_EDGES[counts['bin'] + 1]).replace(np.inf, np.nan).to_numpy()
+    counts.insert(0, 'dimension', dimension)
+    return counts[HISTOGRAM_COLUMNS]
+
+
+def build_salary_distributions(salaries, jobs, job_industries):
+    """Считает квантили и гистограммы зарплат по отраслям, уровню опыта и регионам
+
+    salaries: job_id, annual_salary, currency
+    jobs: job_id, formatted_experience_level, location
+    job_industries: job_id, industry_name
+    """
+    salaries = salaries[salaries['annual_salary'].notna()][['job_id', 'annual_salary', 'currency']]
+
+    with_jobs = salaries.merge(jobs[['job_id', 'formatted_experience_level', 'location']], on='job_id')
+    with_jobs['region'] = extract_region(with_jobs['location'])
+    with_industries = salaries.merge(job_industries[['job_id', 'industry_name']], on='job_id')
+
+    sources = [
+        ('industry', with_industries, 'industry_name'),
+        ('experience_level', with_jobs, 'formatted_experience_level'),
+        ('region', with_jobs, 'region'),
+    ]
+    quantiles = pd.concat([describe_salaries(df, dim, col) for dim, df, col in sources], ignore_index=True)
+    histograms = pd.concat([histogram_salaries(df, dim, col) for dim, df, col in sources], ignore_index=True)
+    return quantiles, histograms
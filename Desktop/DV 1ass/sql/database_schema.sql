@@ -31,7 +31,6 @@ CREATE TABLE jobs (
     job_id VARCHAR PRIMARY KEY,
     company_id VARCHAR,
     title VARCHAR(255),
-    description TEXT,
     location VARCHAR(255),
     views INTEGER DEFAULT 0,
     formatted_work_type VARCHAR(50),
@@ -43,6 +42,14 @@ CREATE TABLE jobs (
     FOREIGN KEY (company_id) REFERENCES companies(company_id)
 );
 
+-- 4a. Описания вакансий (вынесены из jobs, читаются по job_id)
+CREATE TABLE job_descriptions (
+    job_id VARCHAR PRIMARY KEY,
+    description TEXT,
+    FOREIGN KEY (job_id) REFERENCES jobs(job_id)
+);
+ALTER TABLE job_descriptions ALTER COLUMN description SET COMPRESSION lz4;  -- PostgreSQL 14+
+
 -- 5. Таблица бенефитов
 CREATE TABLE benefits (
     id SERIAL PRIMARY KEY,
@@ -52,6 +59,14 @@ CREATE TABLE benefits (
     FOREIGN KEY (job_id) REFERENCES jobs(job_id)
 );
 
+-- 5a. Все бенефиты вакансий (в benefits - по одному на job_id), для битмап-индекса
+CREATE TABLE job_benefits (
+    job_id VARCHAR,
+    type VARCHAR(255),
+    PRIMARY KEY (job_id, type),
+    FOREIGN KEY (job_id) REFERENCES jobs(job_id)
+);
+
 -- 6. Таблица зарплат
 CREATE TABLE salaries (
     salary_id VARCHAR PRIMARY KEY,
@@ -62,6 +77,7 @@ CREATE TABLE salaries (
     pay_period VARCHAR(50),
     currency VARCHAR(10),
     compensation_type VARCHAR(50),
+    annual_salary DECIMAL(12,2),  -- годовая зарплата (по pay_period), NULL если неизвестна
     FOREIGN KEY (job_id) REFERENCES jobs(job_id)
 );
 
@@ -110,6 +126,32 @@ CREATE TABLE job_skills (
     FOREIGN KEY (skill_id) REFERENCES skills(skill_id)
 );
 
+-- 12. Предрасчитанные квантили зарплат (industry / experience_level / region)
+CREATE TABLE salary_distributions (
+    dimension VARCHAR(50) NOT NULL,
+    dimension_value VARCHAR(255) NOT NULL,
+    currency VARCHAR(10) NOT NULL,
+    job_count INTEGER,
+    avg_salary DECIMAL(12,2),
+    min_salary DECIMAL(12,2),
+    q25_salary DECIMAL(12,2),
+    median_salary DECIMAL(12,2),
+    q75_salary DECIMAL(12,2),
+    max_salary DECIMAL(12,2),
+    PRIMARY KEY (dimension, dimension_value, currency)
+);
+
+-- 13. Предрасчитанные гистограммы зарплат (bin_upper = NULL для последней корзины)
+CREATE TABLE salary_histograms (
+    dimension VARCHAR(50) NOT NULL,
+    dimension_value VARCHAR(255) NOT NULL,
+    currency VARCHAR(10) NOT NULL,
+    bin_lower DECIMAL(12,2) NOT NULL,
+    bin_upper DECIMAL(12,2),
+    job_count INTEGER,
+    PRIMARY KEY (dimension, dimension_value, currency, bin_lower)
+);
+
 -- ИНДЕКСЫ ДЛЯ ОПТИМИЗАЦИИ
 CREATE INDEX idx_jobs_company_id ON jobs(company_id);
 CREATE INDEX idx_jobs_location ON jobs(location);